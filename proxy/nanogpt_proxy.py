@@ -4,15 +4,37 @@ Provides a local HTTP endpoint that bypasses SSL/TLS compatibility issues
 between .NET HttpClient and NanoGPT's API infrastructure.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from cachetools import TTLCache
+from pydantic import BaseModel, ConfigDict, ValidationError
+import orjson
+import redis
 import requests
 import logging
-import json
+import atexit
+import hashlib
 import os
+import queue
+import socket
+import sys
 import urllib3
 import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+# Optional semantic cache dependencies (pip install fastembed faiss-cpu)
+try:
+    import numpy as np
+    import faiss
+    from fastembed import TextEmbedding
+    from tokenizers import Tokenizer  # Installed with fastembed
+except ImportError:
+    TextEmbedding = None
 
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -27,28 +49,67 @@ try:
     ssl_context = ssl.create_default_context()
     ssl_context.check_hostname = False
     ssl_context.verify_mode = ssl.CERT_NONE
+    # Skip legacy protocol versions and prefer cheap AEAD ciphers for TLS 1.2 handshakes
+    ssl_context.minimum_version = ssl.TLSVersion.TLSv1_2
+    ssl_context.set_ciphers('ECDHE+AESGCM:ECDHE+CHACHA20')
     
     # Mount a custom adapter with the SSL context
     from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection
     from urllib3.poolmanager import PoolManager
+    from urllib3.util.retry import Retry
+    
+    # TCP keepalive so idle pooled connections stay usable instead of being silently dropped
+    socket_options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    for option_name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 10), ('TCP_KEEPCNT', 6)):
+        if hasattr(socket, option_name):  # Linux-specific options
+            socket_options.append((socket.IPPROTO_TCP, getattr(socket, option_name), value))
     
     class SSLAdapter(HTTPAdapter):
         def init_poolmanager(self, *args, **kwargs):
             kwargs['ssl_context'] = ssl_context
+            kwargs['socket_options'] = socket_options
             return super().init_poolmanager(*args, **kwargs)
     
-    session.mount('https://', SSLAdapter())
+    # Size the connection pool for concurrent workers so connections (and TLS handshakes) are reused.
+    # Connection errors (including DNS failures) and read timeouts are not retried: the discovery loop moves on
+    # to the next candidate instead, so a dead or hung host costs a single timeout.
+    adapter = SSLAdapter(
+        pool_connections=50,
+        pool_maxsize=100,
+        max_retries=Retry(total=2, connect=0, read=0, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
     logger = logging.getLogger(__name__)
     logger.info("Custom SSL adapter mounted successfully")
 except Exception as e:
     logger = logging.getLogger(__name__)
-    logger.warning(f"Failed to create custom SSL adapter: {e}")
+    logger.warning("Failed to create custom SSL adapter: %s", e)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson for faster request parsing and jsonify"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for .NET API calls
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: request threads only enqueue records, a background listener writes them out
+log_queue = queue.SimpleQueue()
+log_output_handler = logging.StreamHandler(sys.stdout)
+log_output_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.handlers = [QueueHandler(log_queue)]
+log_listener = QueueListener(log_queue, log_output_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Configuration - Using official NanoGPT API format
@@ -56,33 +117,319 @@ logger = logging.getLogger(__name__)
 NANOGPT_BASE_URL = os.environ.get('NANOGPT_BASE_URL', 'https://nano-gpt.com/api/v1')
 NANOGPT_API_KEY = os.environ.get('NANOGPT_API_KEY', '')
 
-# Alternative configurations to try
+# Alternative configurations to try (HTTPS hosts first, plain HTTP as a last resort)
 ALTERNATIVE_BASE_URLS = [
     'https://nano-gpt.com/api/v1',     # Official API format (primary)
-    'http://nano-gpt.com/api/v1',      # HTTP fallback
-    'https://api.nanogpt.com',         # Legacy format
-    'http://api.nanogpt.com',          # Legacy HTTP
     'https://nanogpt.com/api/v1',      # Alternative path
+    'https://api.nanogpt.com',         # Legacy format
+    'http://nano-gpt.com/api/v1',      # HTTP fallback
     'http://nanogpt.com/api/v1',       # Alternative HTTP
+    'http://api.nanogpt.com',          # Legacy HTTP
 ]
 
-# Validate configuration
+# (connect, read) timeout: fail fast on unreachable hosts, allow long completions
+UPSTREAM_TIMEOUT = (5, 300)
+
+# Try the configured primary first, then the alternatives
+CANDIDATE_BASE_URLS = [NANOGPT_BASE_URL] + [url for url in ALTERNATIVE_BASE_URLS if url != NANOGPT_BASE_URL]
+
+# Hedged endpoint discovery: probe the HTTPS primary first and only hedge to the other HTTPS candidates
+# if it fails or is slow, so the API key only reaches alternate hosts when the primary is unhealthy.
+# Plain HTTP hosts are never probed since that would send the API key in cleartext.
+DISCOVERY_TIMEOUT = (5, 10)
+DISCOVERY_HEDGE_DELAY_SECONDS = 1.0
+DISCOVERY_BASE_URLS = [url for url in CANDIDATE_BASE_URLS if url.startswith('https://')]
+_discovery_executor = ThreadPoolExecutor(max_workers=max(len(DISCOVERY_BASE_URLS), 1),
+                                         thread_name_prefix='nanogpt-discovery')
+_discovery_lock = threading.Lock()
+
+class ChatCompletionRequest(BaseModel):
+    """Chat completion payload from the .NET client, validated and defaulted in one pass"""
+    model_config = ConfigDict(extra='allow')  # Forward any other OpenAI-compatible options untouched
+    
+    model: str = 'moonshotai/Kimi-K2-Instruct-0905'
+    messages: list[dict]
+    temperature: float = 0.7
+    max_tokens: int = 10000
+    stream: bool = False
+
+# Standard headers for NanoGPT API calls (the API key is fixed for the process lifetime)
+NANOGPT_HEADERS = {
+    'Authorization': f'Bearer {NANOGPT_API_KEY}',
+    'Content-Type': 'application/json',
+    'Accept': 'text/event-stream',
+    'User-Agent': 'AI-Project-Orchestrator-Proxy/1.0'
+}
+
+# Cache of the last working (base_url, endpoint) pair so requests skip URL discovery
+ENDPOINT_CACHE_TTL_SECONDS = 300  # Re-run discovery periodically to revalidate
+_working_endpoint = None
+_endpoint_verified_at = 0.0
+_endpoint_lock = threading.Lock()
+
+# Exact-match response cache for repeated chat completion requests
+RESPONSE_CACHE_TTL_SECONDS = 3600
+response_cache = TTLCache(maxsize=1024, ttl=RESPONSE_CACHE_TTL_SECONDS)
+_response_cache_lock = threading.Lock()
+
+# Optional Redis backing so cached responses are shared across workers and survive restarts
+REDIS_HOST = os.environ.get('REDIS_HOST', '')
+REDIS_CACHE_PREFIX = 'ngc:'
+redis_client = redis.Redis(
+    host=REDIS_HOST,
+    port=int(os.environ.get('REDIS_PORT', '6379')),
+    socket_timeout=0.5,  # A slow cache must never hold up a completion
+    socket_connect_timeout=0.5,
+    decode_responses=False
+) if REDIS_HOST else None
+REDIS_RETRY_AFTER_SECONDS = 30  # After a Redis error, skip Redis for this long instead of timing out per request
+_redis_unavailable_until = 0.0
+
+# Optional semantic cache tier for near-duplicate prompts (requires fastembed and faiss-cpu)
+SEMANTIC_CACHE_ENABLED = os.environ.get('SEMANTIC_CACHE_ENABLED', 'false').lower() == 'true'
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get('SEMANTIC_CACHE_THRESHOLD', '0.95'))
+SEMANTIC_CACHE_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+SEMANTIC_CACHE_MAX_TOKENS = 256  # Model window; longer prompts are truncated, so their tails would be ignored
+
+# Latest background connectivity probe result served by /status
+STATUS_PROBE_INTERVAL_SECONDS = int(os.environ.get('STATUS_PROBE_INTERVAL_SECONDS', '300'))
+_last_probe = None
+_last_probe_at = 0.0
+_probe_in_flight = False
+_probe_lock = threading.Lock()
+
+# Validate configuration: keep serving (health checks, fast 503s) instead of crash-looping workers
 if not NANOGPT_API_KEY:
-    logger.error("NANOGPT_API_KEY environment variable not set")
-    exit(1)
-
-def create_nanogpt_headers():
-    """Create standard headers for NanoGPT API calls"""
-    return {
-        'Authorization': f'Bearer {NANOGPT_API_KEY}',
-        'Content-Type': 'application/json',
-        'Accept': 'text/event-stream',
-        'User-Agent': 'AI-Project-Orchestrator-Proxy/1.0'
-    }
+    logger.warning("NANOGPT_API_KEY environment variable not set, NanoGPT requests will return 503")
+
+def get_endpoint_for_base_url(base_url):
+    """Return the chat completions path for a given base URL format"""
+    if base_url.endswith('/api/v1'):
+        return '/chat/completions'  # Official format: /api/v1/chat/completions
+    return '/v1/chat/completions'  # Legacy OpenAI format: /v1/chat/completions
+
+def get_models_url(base_url):
+    """Return the model list URL for a given base URL format, used as a free discovery probe"""
+    if base_url.endswith('/api/v1'):
+        return f"{base_url}/models"
+    return f"{base_url}/v1/models"
+
+def get_working_endpoint():
+    """Return the cached (base_url, endpoint) if it was verified within the TTL"""
+    with _endpoint_lock:
+        if _working_endpoint and time.monotonic() - _endpoint_verified_at < ENDPOINT_CACHE_TTL_SECONDS:
+            return _working_endpoint
+        return None
+
+def set_working_endpoint(config):
+    """Cache a working (base_url, endpoint) pair, or clear it when config is None; returns True if it changed"""
+    global _working_endpoint, _endpoint_verified_at
+    with _endpoint_lock:
+        changed = config != _working_endpoint
+        _working_endpoint = config
+        _endpoint_verified_at = time.monotonic() if config else 0.0
+        return changed
+
+def _probe_base_url(base_url):
+    """Return the status code of a model list request against a candidate base URL"""
+    response = session.get(get_models_url(base_url), headers=NANOGPT_HEADERS, timeout=DISCOVERY_TIMEOUT, stream=True)
+    response.close()  # Only the status matters
+    return response.status_code
+
+def _probe_succeeded(base_url, future, timeout=None):
+    """Return True if a discovery probe answered 2xx; raises FutureTimeoutError if it is still running"""
+    try:
+        status_code = future.result(timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        logger.debug("Discovery probe for %s failed: %s", base_url, e)
+        return False
+    return 200 <= status_code < 300
+
+def discover_working_endpoint():
+    """
+    Find and cache a working HTTPS base URL, preferring candidate order
+    The primary is probed alone first; the alternates are only probed (concurrently) if it fails or misses
+    the hedge delay, so a cold start costs at most the hedge delay plus one probe timeout
+    """
+    with _discovery_lock:
+        # Another request may have finished discovery while this one waited
+        cached_config = get_working_endpoint()
+        if cached_config:
+            return cached_config
+        
+        primary_url, *alternate_urls = DISCOVERY_BASE_URLS
+        probes = [(primary_url, _discovery_executor.submit(_probe_base_url, primary_url))]
+        try:
+            try:
+                primary_ok = _probe_succeeded(primary_url, probes[0][1], timeout=DISCOVERY_HEDGE_DELAY_SECONDS)
+            except FutureTimeoutError:
+                primary_ok = None  # Still running, hedge with the alternates but keep preferring the primary
+            
+            if not primary_ok:
+                probes += [(base_url, _discovery_executor.submit(_probe_base_url, base_url)) for base_url in alternate_urls]
+            
+            # Results are taken in candidate order, so a faster fallback host never wins over the primary
+            for base_url, future in probes:
+                if _probe_succeeded(base_url, future):
+                    config = (base_url, get_endpoint_for_base_url(base_url))
+                    if set_working_endpoint(config):
+                        logger.info("Discovered NanoGPT endpoint: %s%s", *config)
+                    return config
+        finally:
+            for _, future in probes:
+                future.cancel()
+        
+        logger.warning("Endpoint discovery found no responsive NanoGPT base URL")
+        return None
+
+def redis_available():
+    """Return True if Redis is configured and not in its post-failure cool-down"""
+    return redis_client is not None and time.monotonic() >= _redis_unavailable_until
+
+def mark_redis_unavailable(operation, error):
+    """Skip Redis for REDIS_RETRY_AFTER_SECONDS after a failure"""
+    global _redis_unavailable_until
+    _redis_unavailable_until = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+    logger.warning("Redis cache %s failed, skipping Redis for %ds: %s", operation, REDIS_RETRY_AFTER_SECONDS, error)
+
+def get_cached_response(cache_key):
+    """Look up a cached response body in memory, then Redis; returns (body, source)"""
+    with _response_cache_lock:
+        cached_body = response_cache.get(cache_key)
+    if cached_body is not None:
+        return cached_body, 'memory'
+    
+    if redis_available():
+        try:
+            cached_body = redis_client.get(f"{REDIS_CACHE_PREFIX}{cache_key}")
+        except redis.RedisError as e:
+            mark_redis_unavailable('lookup', e)
+            return None, None
+        if cached_body is not None:
+            with _response_cache_lock:
+                response_cache[cache_key] = cached_body
+            return cached_body, 'redis'
+    return None, None
+
+def store_cached_response(cache_key, response_body):
+    """Store a response body in memory and, when configured, in Redis"""
+    with _response_cache_lock:
+        response_cache[cache_key] = response_body
+    
+    if redis_available():
+        try:
+            redis_client.setex(f"{REDIS_CACHE_PREFIX}{cache_key}", RESPONSE_CACHE_TTL_SECONDS, response_body)
+        except redis.RedisError as e:
+            mark_redis_unavailable('store', e)
+
+def serialize_request(request_data):
+    """Serialize a payload to canonical JSON bytes, used both as the upstream body and for cache keys"""
+    return orjson.dumps(request_data, option=orjson.OPT_SORT_KEYS)
+
+def get_cache_key(request_body):
+    """Build a stable cache key from the canonical JSON bytes of the request payload"""
+    return hashlib.sha256(request_body).hexdigest()
+
+def get_semantic_prompt(request_data):
+    """Return the concatenated user messages, or None if the request is not eligible for semantic caching"""
+    messages = request_data.get('messages')
+    if not isinstance(messages, list) or request_data.get('tools') or request_data.get('functions'):
+        return None
+    
+    user_contents = []
+    for message in messages:
+        # Tool-driven conversations depend on exact state, never serve them from a near match
+        if not isinstance(message, dict) or message.get('role') == 'tool' or message.get('tool_calls'):
+            return None
+        if message.get('role') == 'user':
+            if not isinstance(message.get('content'), str):
+                return None
+            user_contents.append(message['content'])
+    return '\n'.join(user_contents) or None
+
+def get_semantic_context_key(request_data):
+    """Hash the request without user message text so near matches never cross models, options or system prompts"""
+    context = dict(request_data)
+    context['messages'] = [{'role': 'user'} if message.get('role') == 'user' else message
+                           for message in request_data['messages']]
+    return get_cache_key(serialize_request(context))
+
+class SemanticCache:
+    """
+    Embedding-based response cache for near-duplicate prompts
+    Entries are only served for requests with the same context key and a cosine similarity above the threshold
+    """
+    
+    def __init__(self, model_name, threshold, max_tokens=SEMANTIC_CACHE_MAX_TOKENS, max_entries=1024,
+                 ttl_seconds=RESPONSE_CACHE_TTL_SECONDS):
+        self.threshold = threshold
+        self.max_tokens = max_tokens
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._embedder = TextEmbedding(model_name=model_name)
+        self._tokenizer = Tokenizer.from_pretrained(model_name)
+        self._tokenizer.no_truncation()
+        self._index = None
+        self._entries = {}  # index id -> (context_key, expires_at, response_body), oldest first
+        self._next_id = 0
+        self._lock = threading.Lock()
+    
+    def fits_window(self, text):
+        """Return True if the text is embedded whole rather than truncated to the model window"""
+        return len(self._tokenizer.encode(text).ids) <= self.max_tokens
+    
+    def embed(self, text):
+        """Return a normalized embedding so inner product equals cosine similarity"""
+        vector = np.asarray(next(iter(self._embedder.embed([text]))), dtype='float32').reshape(1, -1)
+        faiss.normalize_L2(vector)
+        return vector
+    
+    def get(self, context_key, vector):
+        """Return the cached response body for the closest matching prompt, if any"""
+        with self._lock:
+            if not self._entries:
+                return None
+            scores, ids = self._index.search(vector, min(5, len(self._entries)))
+            now = time.monotonic()
+            for score, entry_id in zip(scores[0], ids[0]):
+                if entry_id < 0 or score < self.threshold:
+                    break
+                entry = self._entries.get(int(entry_id))
+                if entry and entry[0] == context_key and entry[1] > now:
+                    return entry[2]
+        return None
+    
+    def put(self, context_key, vector, response_body):
+        """Add a prompt embedding and its response, evicting expired and then oldest entries when full"""
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexIDMap(faiss.IndexFlatIP(vector.shape[1]))
+            
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                evicted_ids = [entry_id for entry_id, entry in self._entries.items() if entry[1] <= now]
+                if not evicted_ids:
+                    evicted_ids = [next(iter(self._entries))]
+                self._index.remove_ids(np.asarray(evicted_ids, dtype='int64'))
+                for entry_id in evicted_ids:
+                    del self._entries[entry_id]
+            
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, np.asarray([entry_id], dtype='int64'))
+            self._entries[entry_id] = (context_key, time.monotonic() + self.ttl_seconds, response_body)
+
+semantic_cache = None
+if SEMANTIC_CACHE_ENABLED:
+    if TextEmbedding is None:
+        logger.warning("SEMANTIC_CACHE_ENABLED is set but fastembed/faiss-cpu are not installed, semantic cache disabled")
+    else:
+        semantic_cache = SemanticCache(SEMANTIC_CACHE_MODEL, SEMANTIC_CACHE_THRESHOLD)
 
 def log_request(method, url, status_code, response_time):
     """Log API request details for debugging"""
-    logger.info(f"[{datetime.now().isoformat()}] {method} {url} -> {status_code} ({response_time:.3f}s)")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("[%s] %s %s -> %s (%.3fs)", datetime.now().isoformat(), method, url, status_code, response_time)
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -114,9 +461,12 @@ def chat_completions():
     """
     # Use official NanoGPT API format: https://nano-gpt.com/api/v1/chat/completions
     # Based on official documentation
+    if not NANOGPT_API_KEY:
+        return jsonify({'error': 'Proxy misconfigured', 'message': 'NANOGPT_API_KEY environment variable not set'}), 503
+    
     last_error = None
     try:
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         # Get request data from .NET client
         request_data = request.get_json()
@@ -125,63 +475,117 @@ def chat_completions():
             return jsonify({'error': 'No JSON data provided'}), 400
             
         # Log incoming request with size information
-        request_size = len(json.dumps(request_data))
-        logger.info(f"Incoming request: Model={request_data.get('model', 'unknown')}, "
-                   f"Temperature={request_data.get('temperature', 'unknown')}, "
-                   f"Request size: {request_size} characters")
+        request_size = request.content_length or 0  # Body size in bytes, no re-serialization needed
+        logger.info("Incoming request: Model=%s, Temperature=%s, Request size: %d bytes",
+                    request_data.get('model', 'unknown'), request_data.get('temperature', 'unknown'), request_size)
         
         # Warn about large requests
         if request_size > 10000:  # 10KB
-            logger.warning(f"Large request detected ({request_size} characters), may take longer to process")
+            logger.warning("Large request detected (%d bytes), may take longer to process", request_size)
         
-        # Validate required fields
-        if 'messages' not in request_data:
-            return jsonify({'error': 'Missing required field: messages'}), 400
-            
-        # Set default model if not specified
-        if 'model' not in request_data:
-            request_data['model'] = 'moonshotai/Kimi-K2-Instruct-0905'
+        # Pop proxy-only cache options so they are not forwarded to NanoGPT
+        cache_options = request_data.pop('cache', None)
+        use_cache = not request_data.get('stream') and not (
+            isinstance(cache_options, dict) and cache_options.get('bypass'))
+        
+        # Validate required fields and apply defaults
+        try:
+            chat_request = ChatCompletionRequest.model_validate(request_data)
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = '.'.join(str(part) for part in error['loc'])
+            return jsonify({'error': 'Invalid request', 'message': f"{field}: {error['msg']}"}), 400
             
         # Ensure non-streaming mode for simplicity
-        request_data['stream'] = False
+        chat_request.stream = False
+        request_data = chat_request.model_dump()
+        request_body = serialize_request(request_data)  # Encoded once for the cache key and the upstream call
         
-        # Forward request to NanoGPT
-        headers = create_nanogpt_headers()
+        # Serve identical requests from the response cache
+        cache_key = get_cache_key(request_body) if use_cache else None
+        if cache_key:
+            cached_body, cache_source = get_cached_response(cache_key)
+            if cached_body is not None:
+                logger.info("Cache hit (%s): returning cached completion", cache_source)
+                return Response(cached_body, status=200, content_type='application/json',
+                                headers={'X-Cache': 'HIT', 'X-Cache-Tier': 'exact', 'X-Cache-Source': cache_source})
+        
+        # Fall back to the semantic tier for near-duplicate prompts
+        semantic_prompt = get_semantic_prompt(request_data) if cache_key and semantic_cache else None
+        if semantic_prompt and not semantic_cache.fits_window(semantic_prompt):
+            # Text past the window would not affect the embedding, so distinct long prompts could collide
+            semantic_prompt = None
+        if semantic_prompt:
+            semantic_context_key = get_semantic_context_key(request_data)
+            semantic_vector = semantic_cache.embed(semantic_prompt)
+            cached_body = semantic_cache.get(semantic_context_key, semantic_vector)
+            if cached_body is not None:
+                logger.info("Semantic cache hit: returning cached completion")
+                return Response(cached_body, status=200, content_type='application/json',
+                                headers={'X-Cache': 'HIT', 'X-Cache-Tier': 'semantic', 'X-Cache-Source': 'memory'})
         
+        # Forward request to NanoGPT
         # Try different base URLs and endpoints
         response = None
         successful_config = None
         
-        # Try different base URLs with correct endpoint format
-        for base_url in ALTERNATIVE_BASE_URLS:
-            # Build the correct endpoint based on the base URL format
-            if 'nano-gpt.com/api/v1' in base_url:
-                endpoint = '/chat/completions'  # Official format: /api/v1/chat/completions
-            else:
-                endpoint = '/v1/chat/completions'  # Legacy OpenAI format: /v1/chat/completions
-            
+        # Use the cached working endpoint first to skip URL discovery, probing all candidates on a cold cache
+        cached_config = get_working_endpoint() or discover_working_endpoint()
+        if cached_config:
+            base_url, endpoint = cached_config
+            full_url = f"{base_url}{endpoint}"
             try:
-                full_url = f"{base_url}{endpoint}"
-                logger.info(f"Trying: {full_url}")
                 response = session.post(
                     full_url,
-                    json=request_data,
-                    headers=headers,
-                    timeout=300  # Increased timeout for large requests
+                    data=request_body,
+                    headers=NANOGPT_HEADERS,
+                    timeout=UPSTREAM_TIMEOUT,
+                    stream=True  # Body is read or passed through below
                 )
                 
-                if response.status_code not in [404, 405]:  # If not "Not Found" or "Method Not Allowed"
-                    logger.info(f"Success! Using: {full_url} (Status: {response.status_code})")
-                    successful_config = (base_url, endpoint)
-                    break
+                if response.status_code not in [404, 405]:
+                    successful_config = cached_config
                 else:
-                    logger.warning(f"URL {full_url} returned {response.status_code}, trying next...")
-            except Exception as e:
-                logger.error(f"Failed to call {base_url}{endpoint}: {str(e)}")
-                continue
-            
-            if response and response.status_code not in [404, 405]:
-                break
+                    logger.warning("Cached URL %s returned %s, rediscovering...", full_url, response.status_code)
+                    response.close()
+                    set_working_endpoint(None)
+            except requests.exceptions.ConnectionError as e:
+                # Read timeouts and other failures are returned to the client, rediscovery won't help
+                logger.error("Failed to connect to cached %s: %s, rediscovering...", full_url, e)
+                set_working_endpoint(None)
+                response = None
+        
+        # Fall back to URL discovery when there is no cached working endpoint
+        if successful_config is None:
+            # Only move on to the next candidate after structural failures (DNS/connection errors, 404/405);
+            # timeouts and 5xx are returned as-is
+            for base_url in CANDIDATE_BASE_URLS:
+                # Build the correct endpoint based on the base URL format
+                endpoint = get_endpoint_for_base_url(base_url)
+                
+                try:
+                    full_url = f"{base_url}{endpoint}"
+                    logger.debug("Trying: %s", full_url)
+                    response = session.post(
+                        full_url,
+                        data=request_body,
+                        headers=NANOGPT_HEADERS,
+                        timeout=UPSTREAM_TIMEOUT,
+                        stream=True  # Body is read or passed through below
+                    )
+                    
+                    if response.status_code not in [404, 405]:  # If not "Not Found" or "Method Not Allowed"
+                        successful_config = (base_url, endpoint)
+                        # Only log when the endpoint changes, periodic revalidation is routine
+                        if set_working_endpoint(successful_config):
+                            logger.info("Success! Using: %s (Status: %s)", full_url, response.status_code)
+                        break
+                    else:
+                        logger.warning("URL %s returned %s, trying next...", full_url, response.status_code)
+                        response.close()
+                except requests.exceptions.ConnectionError as e:
+                    logger.error("Failed to connect to %s%s: %s", base_url, endpoint, e)
+                    continue
         
         if response is None or response.status_code in [404, 405]:
             logger.error("All NanoGPT API configurations failed")
@@ -191,12 +595,20 @@ def chat_completions():
             }), 502
         
         # Calculate response time
-        response_time = (datetime.now() - start_time).total_seconds()
+        response_time = time.perf_counter() - start_time
         log_request('POST', '/v1/chat/completions', response.status_code, response_time)
         
         if response.status_code == 200:
+            content_type = response.headers.get('Content-Type', 'application/json')
+            
+            # Nothing to cache: pass the upstream bytes straight through without parsing
+            if not cache_key:
+                return Response(response.iter_content(chunk_size=8192), status=200, content_type=content_type,
+                                headers={'X-Cache': 'MISS', 'X-Cache-Source': 'miss'})
+            
             # Successfully got response from NanoGPT
-            response_data = response.json()
+            response_body = response.content
+            response_data = orjson.loads(response_body)
             
             # Validate response structure
             if 'choices' not in response_data or not response_data['choices']:
@@ -204,12 +616,23 @@ def chat_completions():
                 return jsonify({'error': 'Invalid response from NanoGPT API'}), 502
                 
             # Log successful completion
-            content_length = len(response_data['choices'][0].get('message', {}).get('content', ''))
-            logger.info(f"Successful completion: {content_length} characters generated")
+            if logger.isEnabledFor(logging.INFO):
+                content_length = len((response_data['choices'][0].get('message') or {}).get('content') or '')
+                logger.info("Successful completion: %d characters generated", content_length)
+            
+            # Cache the completion unless it asks the client to run tools
+            has_tool_calls = any((choice.get('message') or {}).get('tool_calls') for choice in response_data['choices'])
+            if not has_tool_calls:
+                store_cached_response(cache_key, response_body)
+                if semantic_prompt:
+                    semantic_cache.put(semantic_context_key, semantic_vector, response_body)
             
-            return jsonify(response_data)
+            # Return the upstream bytes as-is instead of re-serializing the parsed data
+            return Response(response_body, status=200, content_type=content_type,
+                            headers={'X-Cache': 'MISS', 'X-Cache-Source': 'miss'})
             
         elif response.status_code == 401:
+            response.close()
             logger.error("NanoGPT authentication failed - check API key")
             return jsonify({
                 'error': 'Authentication failed',
@@ -217,6 +640,7 @@ def chat_completions():
             }), 401
             
         elif response.status_code == 429:
+            response.close()
             logger.error("NanoGPT rate limit exceeded")
             return jsonify({
                 'error': 'Rate limit exceeded',
@@ -225,7 +649,7 @@ def chat_completions():
             
         else:
             # Other error responses
-            logger.error(f"NanoGPT API error: {response.status_code} - {response.text}")
+            logger.error("NanoGPT API error: %s - %s", response.status_code, response.text)
             return jsonify({
                 'error': f'NanoGPT API error: {response.status_code}',
                 'message': response.text[:200]  # Truncate long error messages
@@ -240,85 +664,95 @@ def chat_completions():
         return jsonify({'error': 'Connection error', 'message': 'Unable to connect to NanoGPT API'}), 503
         
     except requests.exceptions.RequestException as e:
-        logger.error(f"Request exception: {str(e)}")
+        logger.error("Request exception: %s", e)
         return jsonify({'error': 'Request failed', 'message': str(e)}), 500
         
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         logger.error("Invalid JSON in NanoGPT response")
         return jsonify({'error': 'Invalid response', 'message': 'NanoGPT returned invalid JSON'}), 502
         
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+        logger.error("Unexpected error: %s", e)
         return jsonify({'error': 'Internal server error', 'message': 'An unexpected error occurred'}), 500
 
-@app.route('/status', methods=['GET'])
-def proxy_status():
-    """
-    Detailed status endpoint for debugging
-    Tests actual connectivity to NanoGPT API
-    """
+def probe_nanogpt_connectivity():
+    """Test connectivity to NanoGPT API with a model list request, which costs no quota"""
     try:
-        # Test NanoGPT connectivity with a minimal request
-        headers = create_nanogpt_headers()
-        test_request = {
-            "model": "moonshotai/Kimi-K2-Instruct-0905",
-            "messages": [{"role": "user", "content": "Hello"}],
-            "max_tokens": 1,
-            "temperature": 0
-        }
-        
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         # Try the official API format first
         try:
-            response = session.post(
-                f"{NANOGPT_BASE_URL}/chat/completions",
-                json=test_request,
-                headers=headers,
-                timeout=10
-            )
-            response_time = (datetime.now() - start_time).total_seconds()
+            response = session.get(get_models_url(NANOGPT_BASE_URL), headers=NANOGPT_HEADERS, timeout=10)
+            response_time = time.perf_counter() - start_time
         except Exception as e:
             # Fallback to legacy format
             try:
-                response = session.post(
-                    f"https://api.nanogpt.com/v1/chat/completions",
-                    json=test_request,
-                    headers=headers,
-                    timeout=10
-                )
-                response_time = (datetime.now() - start_time).total_seconds()
+                response = session.get(get_models_url('https://api.nanogpt.com'), headers=NANOGPT_HEADERS, timeout=10)
+                response_time = time.perf_counter() - start_time
             except Exception as e2:
-                return jsonify({
-                    'proxy_status': 'operational',
+                return {
                     'nanogpt_connectivity': 'failed',
                     'error': f'Both API formats failed: {str(e)}',
-                    'api_key_configured': bool(NANOGPT_API_KEY),
-                    'timestamp': datetime.now().isoformat()
-                })
+                    'last_checked': datetime.now().isoformat()
+                }
         
-        return jsonify({
-            'proxy_status': 'operational',
+        return {
             'nanogpt_connectivity': 'success' if response.status_code == 200 else 'failed',
             'nanogpt_status_code': response.status_code,
             'response_time_seconds': response_time,
-            'api_key_configured': bool(NANOGPT_API_KEY),
-            'timestamp': datetime.now().isoformat()
-        })
+            'last_checked': datetime.now().isoformat()
+        }
         
     except Exception as e:
-        return jsonify({
-            'proxy_status': 'operational',
+        return {
             'nanogpt_connectivity': 'failed',
             'error': str(e),
-            'api_key_configured': bool(NANOGPT_API_KEY),
-            'timestamp': datetime.now().isoformat()
-        })
+            'last_checked': datetime.now().isoformat()
+        }
+
+def _refresh_probe():
+    """Run the connectivity probe and store its result for /status"""
+    global _last_probe, _last_probe_at, _probe_in_flight
+    probe_result = probe_nanogpt_connectivity()
+    with _probe_lock:
+        _last_probe = probe_result
+        _last_probe_at = time.monotonic()
+        _probe_in_flight = False
+    return probe_result
+
+@app.route('/status', methods=['GET'])
+def proxy_status():
+    """
+    Detailed status endpoint for debugging
+    Reports NanoGPT connectivity from the latest background probe
+    """
+    global _probe_in_flight
+    if not NANOGPT_API_KEY:
+        return jsonify({'error': 'Proxy misconfigured', 'message': 'NANOGPT_API_KEY environment variable not set'}), 503
+    
+    # Probes only happen when /status is actually called, so an idle deployment sends none.
+    # The response never waits on upstream: a cold or stale result starts a single background refresh.
+    with _probe_lock:
+        probe_result = _last_probe or {'nanogpt_connectivity': 'unknown'}
+        refresh_in_background = not _probe_in_flight and (
+            _last_probe is None or time.monotonic() - _last_probe_at >= STATUS_PROBE_INTERVAL_SECONDS)
+        if refresh_in_background:
+            _probe_in_flight = True
+    
+    if refresh_in_background:
+        threading.Thread(target=_refresh_probe, name='nanogpt-status-probe', daemon=True).start()
+    
+    return jsonify({
+        'proxy_status': 'operational',
+        **probe_result,
+        'api_key_configured': bool(NANOGPT_API_KEY),
+        'timestamp': datetime.now().isoformat()
+    })
 
 if __name__ == '__main__':
     logger.info("Starting NanoGPT Proxy Service...")
-    logger.info(f"Target API: {NANOGPT_BASE_URL}")
-    logger.info(f"API Key configured: {bool(NANOGPT_API_KEY)}")
+    logger.info("Target API: %s", NANOGPT_BASE_URL)
+    logger.info("API Key configured: %s", bool(NANOGPT_API_KEY))
     
     # Run Flask development server
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,10 @@
+"""
+WSGI entry point for running the NanoGPT proxy under gunicorn gevent workers.
+Monkey patching happens before the proxy module is imported so that requests,
+urllib3, ssl and threading all use cooperative gevent primitives.
+"""
+
+from gevent import monkey
+monkey.patch_all()
+
+from nanogpt_proxy import app  # noqa: E402